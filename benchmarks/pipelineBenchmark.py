@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/**
+ *  Performance regression suite for the closed-loop analysis pipeline. The script runs the CaImAn OnACID
+ *  analysis headless (no pipes, no plotting) with the parameter sets of the analysis scripts
+ *  (scripts/analysisParams.py) on the demo calcium recording and on synthetic movies of several sizes,
+ *  and measures initialization time, per-frame fit_next() time and peak memory (RSS). Throughput of the
+ *  pipe helpers in scripts/pipeHelpers.py is measured over real named pipes, both for text messages
+ *  (MicroManager) and for packed doubles (StdpC). Results are compared against stored baselines and the
+ *  script exits with a non-zero status when any metric regresses beyond its tolerance. Every case is run
+ *  --repeat times (each analysis run in a fresh process) and the median of each metric is compared.
+ *
+ *  usage:
+ *      python pipelineBenchmark.py                     # run and compare against baselines.json
+ *      python pipelineBenchmark.py --update-baseline   # run and store results as the new baselines
+ *      python pipelineBenchmark.py --cases synthetic-small transport --params demo
+ *
+ *  Baselines are machine specific, so record them on the machine that runs the experiment. Until they are
+ *  recorded the check fails. Every selected case must produce a result, so a skipped case (e.g. the demo
+ *  recording is not fetched) fails the check and blocks --update-baseline, unless it is excluded with
+ *  --cases/--params.
+ */
+
+"""
+
+# %% ********* Importing packages: *********
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+windows = os.name != 'posix'
+if not windows:
+    import resource
+
+benchmarkDirectory = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(benchmarkDirectory, os.pardir, 'scripts'))
+from pipeHelpers import p_create, p_open, p_connect, p_close, p_write, p_read, p_write_sample, p_read_sample
+from analysisParams import imageAnalysisParams, demoAnalysisParams
+
+defaultBaselineFile = os.path.join(benchmarkDirectory, 'baselines.json')
+defaultDemoFile = os.path.join(benchmarkDirectory, os.pardir, 'demos', 'demoCalciumRecording.tif')
+
+# %% ********* Defining benchmark cases: *********
+# parameter sets of the analysis scripts (scripts/analysisParams.py)
+paramSets = {'imageAnalysis': imageAnalysisParams,
+             'demo': demoAnalysisParams,
+             }
+
+syntheticFrames = 500   # length of synthetic movies, frames after init_batch are processed by fit_next()
+
+# name: (height, width, neuron radius in pixels)
+syntheticCases = {'synthetic-small': (64, 64, 6),
+                  'synthetic-medium': (128, 128, 12),
+                  'synthetic-large': (256, 256, 26),
+                  }
+
+transportMessages = 20000   # number of messages sent through the pipe for each transport metric
+
+# direction of each metric: 'lower' if smaller values are better, 'higher' otherwise
+metricDirection = {'init_s': 'lower',
+                   'fit_next_median_ms': 'lower',
+                   'fit_next_p95_ms': 'lower',
+                   'peak_rss_mb': 'lower',
+                   'text_pipe_msg_per_s': 'higher',
+                   'sample_pipe_per_s': 'higher',
+                   }
+
+
+def analysisCaseParams(paramSet, fileToProcess, neuronRadius=None):
+    """Parameter set used by the analysis scripts, headless. For synthetic movies the neuron size is
+    scaled to the movie, all other parameters are kept as the scripts define them."""
+    initialParamsDict = paramSets[paramSet](fileToProcess)
+    initialParamsDict['show_movie'] = False
+    if neuronRadius is not None:
+        initialParamsDict['gSig'] = (neuronRadius, neuronRadius)
+        initialParamsDict['gSiz'] = (4 * neuronRadius + 1, 4 * neuronRadius + 1)
+    return initialParamsDict
+
+
+# %% ********* Measuring helpers: *********
+def peakRSS():
+    """Peak resident set size of the current process in MB."""
+    if windows:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10     # bytes on macOS, kB on Linux
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def makeSyntheticMovie(fileName, height, width, neuronRadius, frames, seed=0):
+    """Write a movie with a single gaussian neuron firing calcium transients on a noisy background."""
+    import numpy as np
+    import caiman as cm
+
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    footprint = np.exp(-((y - height / 2) ** 2 + (x - width / 2) ** 2) / (2 * neuronRadius ** 2))
+
+    spikes = rng.poisson(0.05, frames).astype(np.float32)
+    decay = np.exp(-1 / (40 * .45))      # AR(1) coefficient for fr=40 and decay_time=0.45
+    trace = np.zeros(frames, dtype=np.float32)
+    for t in range(frames):
+        trace[t] = (trace[t - 1] * decay if t else 0) + spikes[t]
+
+    data = 100 + 50 * trace[:, None, None] * footprint[None] + rng.normal(0, 5, (frames, height, width))
+    cm.movie(data.astype(np.float32)).save(fileName)
+    return fileName
+
+
+def isLFSPointer(fileName):
+    with open(fileName, 'rb') as f:
+        return f.read(40).startswith(b'version https://git-lfs')
+
+
+# %% ********* Analysis benchmark (runs in a fresh process so peak RSS is per case): *********
+def runAnalysis(initialParamsDict):
+    from caiman.source_extraction.cnmf import params as params
+    from caiman.source_extraction import cnmf as cnmf
+
+    frameTimes = []
+
+    # wrap fit_next() the same way the analysis scripts monkeypatch it, but only to time it
+    def monkeypatch(func):
+        def wrapped(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            frameTimes.append(time.perf_counter() - start)
+            return result
+        return wrapped
+
+    cnmf.online_cnmf.OnACID.fit_next = monkeypatch(cnmf.online_cnmf.OnACID.fit_next)
+
+    allParams = params.CNMFParams(params_dict=initialParamsDict)
+    caimanResults = cnmf.online_cnmf.OnACID(params=allParams)
+
+    caimanResults.fit_online()      # initializes the model itself and stores the time in t_init
+
+    if not frameTimes:
+        raise RuntimeError("fit_next() was never called, movie is shorter than init_batch")
+
+    return {'init_s': caimanResults.t_init,
+            'fit_next_median_ms': 1e3 * percentile(frameTimes, 50),
+            'fit_next_p95_ms': 1e3 * percentile(frameTimes, 95),
+            'peak_rss_mb': peakRSS(),
+            }
+
+
+def repeatMedian(repeat, func, *args):
+    """Run a benchmark repeat times and return the median of each metric."""
+    runs = [func(*args) for _ in range(repeat)]
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+def runIsolated(func, *args):
+    """Run func in a new interpreter so that peak RSS and monkeypatching do not leak between cases."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        return pool.apply(func, args)
+
+
+# %% ********* Transport benchmark (pipe helpers from scripts/pipeHelpers.py): *********
+def pipeThroughput(name, values, write, read):
+    """Send values from a server pipe (p_create/p_open, as CaImAn does) to a client (p_connect, as
+    MicroManager/StdpC do) and return the number of messages received per second. Only the transfer is
+    timed, both ends are connected before the timer starts."""
+    connected = threading.Barrier(2)
+
+    def serve():
+        server = p_create(name, False)
+        p_open(server)
+        connected.wait()
+        for value in values:
+            write(server, value)
+        p_close(server)
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    client = p_connect(name, True)
+    connected.wait()
+    start = time.perf_counter()
+    received = [read(client) for _ in values]
+    elapsed = time.perf_counter() - start
+    thread.join()
+    p_close(client)
+
+    if received != values:
+        raise RuntimeError(f"transport corrupted messages on {name}")
+    return len(values) / elapsed
+
+
+def runTransport():
+    messages = [f"{0.01 * (i % 200):.6f}" for i in range(transportMessages)]
+    samples = [0.01 * (i % 200) * (1 if i % 2 else -1) for i in range(transportMessages)]
+    prefix = f"benchmark-{os.getpid()}"
+
+    return {'text_pipe_msg_per_s': pipeThroughput(prefix + "-text.ser", messages, p_write, p_read),
+            'sample_pipe_per_s': pipeThroughput(prefix + "-sample.ser", samples, p_write_sample, p_read_sample),
+            }
+
+
+# %% ********* Comparing with baselines: *********
+def loadBaselines(fileName):
+    if not os.path.exists(fileName):
+        return {'tolerances': {}, 'baselines': {}}
+    with open(fileName) as f:
+        return json.load(f)
+
+
+def relativeChange(value, baseline):
+    if baseline == 0:
+        return 0.0 if value == 0 else float('inf') if value > 0 else float('-inf')
+    return (value - baseline) / abs(baseline)
+
+
+def compare(results, stored, selectedCases, problems=None):
+    """Return a list of failures: selected cases without a result (problems maps a case to the reason it
+    was skipped), cases or metrics without a baseline, and metrics that regressed beyond their tolerance."""
+    tolerances = stored.get('tolerances', {})
+    baselines = stored.get('baselines', {})
+    problems = problems or {}
+    failures = []
+
+    for case in selectedCases:
+        if case not in results:
+            reason = problems.get(case, "no result")
+            print(f"  {case:32s} MISSING ({reason})")
+            failures.append(f"{case}: {reason}")
+            continue
+        if case not in baselines:
+            for metric, value in sorted(results[case].items()):
+                print(f"  {case:32s} {metric:20s} {value:14.3f}   NO BASELINE")
+            failures.append(f"{case}: no baseline stored, record one with --update-baseline")
+            continue
+
+        metrics = results[case]
+        for metric in sorted(set(metrics) | set(baselines[case])):
+            value, baseline = metrics.get(metric), baselines[case].get(metric)
+            if value is None:
+                print(f"  {case:32s} {metric:20s} {'-':>14s}   baseline {baseline:14.3f}   MISSING")
+                failures.append(f"{case}/{metric}: baseline stored but no result")
+                continue
+            if baseline is None:
+                print(f"  {case:32s} {metric:20s} {value:14.3f}   NO BASELINE")
+                failures.append(f"{case}/{metric}: no baseline stored, record one with --update-baseline")
+                continue
+            tolerance = tolerances.get(metric, tolerances.get('default', 0.25))
+            change = relativeChange(value, baseline)
+            regressed = change > tolerance if metricDirection[metric] == 'lower' else change < -tolerance
+            print(f"  {case:32s} {metric:20s} {value:14.3f}   baseline {baseline:14.3f}   "
+                  f"{100 * change:+7.1f}%{'   REGRESSION' if regressed else ''}")
+            if regressed:
+                failures.append(f"{case}/{metric}: {value:.3f} vs baseline {baseline:.3f} "
+                                f"({100 * change:+.1f}%, tolerance {100 * tolerance:.0f}%)")
+
+    for case in sorted(set(baselines) - set(selectedCases)):
+        print(f"  {case:32s} excluded with --cases/--params")
+    return failures
+
+
+def main(argv=None):
+    movies = ['recording'] + list(syntheticCases)
+
+    parser = argparse.ArgumentParser(description="Closed-loop pipeline performance regression suite")
+    parser.add_argument('--cases', nargs='+', choices=movies + ['transport'], default=movies + ['transport'],
+                        help="movies to analyse ('recording' is the demo recording) and/or the transport benchmark")
+    parser.add_argument('--params', nargs='+', choices=list(paramSets), default=list(paramSets),
+                        help="parameter sets from scripts/analysisParams.py used for each movie")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="number of runs per case, the median of each metric is compared")
+    parser.add_argument('--baseline-file', default=defaultBaselineFile)
+    parser.add_argument('--demo-file', default=defaultDemoFile)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store the results of this run as the new baselines instead of comparing")
+    args = parser.parse_args(argv)
+
+    selectedCases = [f"{paramSet}/{movie}" for movie in args.cases if movie != 'transport'
+                     for paramSet in args.params]
+    if 'transport' in args.cases:
+        selectedCases.append('transport')
+
+    results, problems = {}, {}
+
+    def runCase(cases, func, *args):
+        """Run one benchmark; on error report it for all cases that depend on it and carry on."""
+        try:
+            return func(*args)
+        except Exception as e:
+            reason = f"failed, {type(e).__name__}: {e}"
+            print(f"*** ERROR *** {', '.join(cases)} {reason}")
+            problems.update({case: reason for case in cases})
+
+    with tempfile.TemporaryDirectory() as directory:
+        for movie in args.cases:
+            if movie == 'transport':
+                print("*** Running transport ***")
+                transport = runCase(['transport'], repeatMedian, args.repeat, runTransport)
+                if transport is not None:
+                    results['transport'] = transport
+                continue
+
+            movieCases = [f"{paramSet}/{movie}" for paramSet in args.params]
+            if movie == 'recording':
+                if not os.path.exists(args.demo_file) or isLFSPointer(args.demo_file):
+                    reason = f"{args.demo_file} is missing or not fetched (git lfs pull)"
+                    print(f"Skipping recording: {reason}")
+                    problems.update({case: "skipped, " + reason for case in movieCases})
+                    continue
+                fileToProcess, neuronRadius = os.path.abspath(args.demo_file), None
+            else:
+                height, width, neuronRadius = syntheticCases[movie]
+                fileToProcess = runCase(movieCases, makeSyntheticMovie, os.path.join(directory, movie + '.tif'),
+                                        height, width, neuronRadius, syntheticFrames)
+                if fileToProcess is None:
+                    continue
+
+            for paramSet, case in zip(args.params, movieCases):
+                print(f"*** Running {case} ***")
+                metrics = runCase([case], repeatMedian, args.repeat, runIsolated, runAnalysis,
+                                  analysisCaseParams(paramSet, fileToProcess, neuronRadius))
+                if metrics is not None:
+                    results[case] = metrics
+
+    stored = loadBaselines(args.baseline_file)
+
+    if args.update_baseline:
+        missing = [case for case in selectedCases if case not in results]
+        if missing:
+            print("*** BASELINES NOT WRITTEN *** no result for: " + ", ".join(missing))
+            print("Fix these cases or exclude them with --cases/--params.")
+            return 1
+        stored.setdefault('baselines', {}).update(results)
+        with open(args.baseline_file, 'w') as f:
+            json.dump(stored, f, indent=4, sort_keys=True)
+            f.write('\n')
+        print(f"Baselines written to {args.baseline_file}")
+        return 0
+
+    print("*** Comparing with baselines ***")
+    failures = compare(results, stored, selectedCases, problems)
+    if failures:
+        print("*** PERFORMANCE CHECK FAILED ***")
+        for failure in failures:
+            print("  " + failure)
+        return 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+from pipelineBenchmark import compare
+
+stored = {'tolerances': {'default': 0.25},
+          'baselines': {'transport': {'text_pipe_msg_per_s': 1000.0, 'sample_pipe_per_s': 1000.0}}}
+transport = {'text_pipe_msg_per_s': 1000.0, 'sample_pipe_per_s': 1000.0}
+
+
+def test_selected_case_without_result_or_baseline_fails():
+    failures = compare({'transport': transport}, stored, ['demo/recording', 'transport'],
+                       {'demo/recording': "skipped, not fetched"})
+    assert failures == ["demo/recording: skipped, not fetched"]
+
+
+def test_case_without_baseline_fails():
+    results = {'transport': transport, 'demo/synthetic-small': {'init_s': 1.0}}
+    failures = compare(results, stored, ['demo/synthetic-small', 'transport'])
+    assert len(failures) == 1 and failures[0].startswith("demo/synthetic-small: no baseline")
+
+
+def test_regression_and_zero_baseline():
+    results = {'transport': {'text_pipe_msg_per_s': 500.0, 'sample_pipe_per_s': 1000.0}}
+    assert len(compare(results, stored, ['transport'])) == 1
+
+    zero = {'baselines': {'transport': {'text_pipe_msg_per_s': 0.0, 'sample_pipe_per_s': 0.0}}}
+    assert compare({'transport': transport}, zero, ['transport']) == []
+
+
+def test_excluded_case_passes():
+    assert compare({'transport': transport}, stored, ['transport']) == []
@@ -23,6 +23,9 @@ from caiman.source_extraction import cnmf as cnmf
 import os
 from caiman.paths import caiman_datadir
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'scripts'))
+from analysisParams import demoAnalysisParams
+
 # %% ********* Creating named pipes for communication with MicroManager: *********
 timer = TicToc()
 timer.tic()    # start measuring time
@@ -66,51 +69,12 @@ print("*** Defining analysis parameters ***")
 fileToProcess = os.path.join(CaimanFileDirectory, 'demoCalciumRecording', 'demoCalciumRecording_MMStack_Default.ome.tif') # FOR TESTING PURPOSES
 
 
-fr = 40  # frame rate (Hz)
-decay_time = .45  # approximate length of transient event in seconds (for GCaMP6s)
-gSig = (26, 26)       # gaussian width of a 2D gaussian kernel, which approximates a neuron
-gSiz = (120, 120)     # average diameter of a neuron, in general 4*gSig+1
-p = 1  # order of AR indicator dynamics 
-min_SNR = 0.2  # minimum SNR for accepting candidate components
-thresh_CNN_noisy = 0.65  # CNN threshold for candidate components
-gnb = 1  # number of background components
-initMethod_online = 'bare'  # initialization method ('cnmf' will save init_file.hdf5, 'bare' will not.. not sure why)
-deconv_method = 'oasis'
-
-# set up CNMF initialization parameters
-initFrames = 300  # number of frames for initialization
-# patch_size = 400  # size of patch
-# stride = 30  # amount of overlap between patches
-K = 1  # max number of components in each patch
-new_K = 0
-cnnFlag = True
+initialParamsDict = demoAnalysisParams(fileToProcess)      # parameter set is defined in scripts/analysisParams.py
 
-initialParamsDict = {'fr': fr,
-               'fnames': fileToProcess,                # file used for initialization
-               'decay_time': decay_time,
-               'gSig': gSig,
-               'gSiz': gSiz,
-               'p': p,
-               'center_psf': False,                 # set true for 1p data processing
-               'simultaneously': True,             # whether to demix and deconvolve simultaneously
-               'normalize': True,                  # whether to normalize each frame prior to online processing
-               'min_SNR': min_SNR,
-               'nb': gnb,
-               'init_batch': initFrames,
-               'init_method': initMethod_online,
-               'rf': None,                          # half-size of patch in pixels. If None, no patches are constructed and the whole FOV is processed jointly
-               #'stride': stride,
-               'update_num_comps': False,
-               'motion_correct': False,
-               'sniper_mode': True,                 # whether to use the online CNN classifier for screening candidate components (otherwise space correlation is used)
-               'thresh_CNN_noisy': thresh_CNN_noisy,
-               'K': K,
-               'expected_comps': K,
-               'update_num_comps': False,           # whether to search for new components
-               'min_num_trial': new_K,
-               'method_deconvolution': deconv_method,
-               'show_movie': True
-               }
+initFrames = initialParamsDict['init_batch']  # number of frames for initialization
+initMethod_online = initialParamsDict['init_method']
+K = initialParamsDict['K']  # max number of components in each patch
+cnnFlag = True
 
 
 allParams = params.CNMFParams(params_dict=initialParamsDict)    # define parameters in the params.CNMFParams
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/**
+ *  CaImAn parameter sets used by the analysis scripts. imageAnalysisParams() is used by
+ *  scripts/imageAnalysis.py during actual imaging, demoAnalysisParams() by demos/AnalysisDemo.py.
+ *  The benchmark suite imports the same functions, so parameter changes made here are benchmarked.
+ *
+ *  The parameter definitions were moved here unchanged from imageAnalysis.py and AnalysisDemo.py.
+ */
+
+"""
+
+
+def imageAnalysisParams(fileToProcess):
+    """Parameters for online analysis during actual imaging (scripts/imageAnalysis.py)."""
+    fps = 40                # ideally it would be calculated by: (frame2-frame1) / totalTime(s)
+    decayTime = 0.45        # length of a typical transient in seconds
+    noiseStd = 'mean'       # PSD averaging method for computing noise std
+    arSystem = 1            # order of the autoregressive system
+    expectedNeurons = 1     # number of expected neurons (upper bound), usually None, but we have only one in FOV
+    patches = None          # if None, the whole FOV is processed, otherwise: specify half-size of patch in pixels
+    onePhoton = True        # whether to use 1p processing mode
+    spatDown = 3            # spatial downsampling during initialisation, increase if there is memory problem (default=2)
+    tempDown = 1            # temporal downsampling during initialisation, increase if there is memory problem (default=2)
+    backDown = 5            # additional spatial downsampling factor for background (higher values increase the speed, without accuracy loss)
+    backComponents = 0      # number of background components (rank) if positive, else exact ring model with following settings
+    #                         gnb= 0: Return background as b and W
+    #                         gnb=-1: Return full rank background B
+    #                         gnb<-1: Don't return background
+    minCorr = 0.85          # minimum value of correlation image for determining a candidate component during greedy_pnr
+    minPNR = 20             # minimum value of psnr image for determining a candidate component during greedy_pnr
+    ringSize = 1.5          # radius of ring (*gSig) for computing background during greedy_pnr
+    minSNR = 1.5            # traces with SNR above this will get accepted
+    lowestSNR = 0.5         # traces with SNR below will be rejected
+    spaceThr = 0.9          # space correlation threshold, components with correlation higher than this will get accepted
+    neuronRadius = (120, 120) # radius of average neurons (in pixels)
+    neuronBound = (30, 30)  # half-size of bounding box for each neuron, in general 4*gSig+1
+
+
+    # params for OnACID:
+    spatDown_online = 3     # spatial downsampling factor for faster processing (if > 1)
+    epochs = 1              # number of times to go over data
+    expectedNeurons_online = 1  # number of expected components (for memory allocation purposes)
+    initFrames = 300        # length of mini batch used for initialization
+    initMethod_online = 'bare'  # or use 'cnmf'
+    minSNR_online = 1     # traces with SNR above this will get accepted
+    motCorrection = False   # flag for motion correction during online analysis
+    normalize_online = True     # whether to normalize each frame prior to online processing
+    cnnFlag = True              # whether to use the online CNN classifier for screening candidate components (otherwise space correlation is used)
+    thresh_CNN_noisy = 0.5      # threshold for the online CNN classifier
+
+    # create a dictionary with parameter-value pairs
+    return { 'fnames': fileToProcess,
+              'fr': fps,
+              'decay_time': decayTime,
+              'noise_method': noiseStd,
+              'p': arSystem,
+              'K': expectedNeurons,
+              'rf': patches,
+              'center_psf': onePhoton,
+              'ssub': spatDown,
+              'tsub': tempDown,
+              'nb': backComponents,
+              'min_corr': minCorr,
+              'min_pnr': minPNR,
+              'ring_size_factor': ringSize,
+              'ssub_B': backDown,
+              'normalize_init': False,                  # leave it True for 1p
+              'update_background_components': False,    # improves results
+              'method_deconvolution': 'oasis',          # could use 'cvxpy' alternatively
+              'SNR_lowest': lowestSNR,
+              'rval_thr': spaceThr,
+              'gSig': neuronRadius,
+              'gSiz': neuronBound,
+
+        # params for OnACID:
+              'ds_factor': spatDown_online,
+              'epochs': epochs,
+              'expected_comps': expectedNeurons_online,
+              'init_batch': initFrames,
+              'init_method':initMethod_online,
+              'min_SNR': minSNR_online,
+              'motion_correct': motCorrection,
+              'normalize': normalize_online,
+              'save_online_movie': False,
+              'show_movie': True,
+              'update_num_comps': False,        # whether to search for new components
+              'sniper_mode': cnnFlag,
+              'thresh_CNN_noisy': thresh_CNN_noisy,
+
+
+    }
+
+
+def demoAnalysisParams(fileToProcess):
+    """Parameters for the demo recording (demos/AnalysisDemo.py)."""
+    fr = 40  # frame rate (Hz)
+    decay_time = .45  # approximate length of transient event in seconds (for GCaMP6s)
+    gSig = (26, 26)       # gaussian width of a 2D gaussian kernel, which approximates a neuron
+    gSiz = (120, 120)     # average diameter of a neuron, in general 4*gSig+1
+    p = 1  # order of AR indicator dynamics
+    min_SNR = 0.2  # minimum SNR for accepting candidate components
+    thresh_CNN_noisy = 0.65  # CNN threshold for candidate components
+    gnb = 1  # number of background components
+    initMethod_online = 'bare'  # initialization method ('cnmf' will save init_file.hdf5, 'bare' will not.. not sure why)
+    deconv_method = 'oasis'
+
+    # set up CNMF initialization parameters
+    initFrames = 300  # number of frames for initialization
+    # patch_size = 400  # size of patch
+    # stride = 30  # amount of overlap between patches
+    K = 1  # max number of components in each patch
+    new_K = 0
+
+    return {'fr': fr,
+               'fnames': fileToProcess,                # file used for initialization
+               'decay_time': decay_time,
+               'gSig': gSig,
+               'gSiz': gSiz,
+               'p': p,
+               'center_psf': False,                 # set true for 1p data processing
+               'simultaneously': True,             # whether to demix and deconvolve simultaneously
+               'normalize': True,                  # whether to normalize each frame prior to online processing
+               'min_SNR': min_SNR,
+               'nb': gnb,
+               'init_batch': initFrames,
+               'init_method': initMethod_online,
+               'rf': None,                          # half-size of patch in pixels. If None, no patches are constructed and the whole FOV is processed jointly
+               #'stride': stride,
+               'update_num_comps': False,
+               'motion_correct': False,
+               'sniper_mode': True,                 # whether to use the online CNN classifier for screening candidate components (otherwise space correlation is used)
+               'thresh_CNN_noisy': thresh_CNN_noisy,
+               'K': K,
+               'expected_comps': K,
+               'update_num_comps': False,           # whether to search for new components
+               'min_num_trial': new_K,
+               'method_deconvolution': deconv_method,
+               'show_movie': True
+               }
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/**
+ *  Named pipe helpers for the closed-loop scripts. The server side (p_create, p_open) is the CaImAn end of
+ *  the loop; the client side (p_connect) is what MicroManager or StdpC does on the other end. Text messages
+ *  are line based (MicroManager triggers), samples are packed as native doubles (values streamed to StdpC).
+ *  On Windows the pipes are win32 message pipes, elsewhere FIFOs in /tmp.
+ *
+ *  p_create, p_open, p_close, p_write and p_read were moved here from imageAnalysis.py, the sample framing
+ *  from stdpc-pipe.py.
+ */
+
+"""
+
+import os, struct, time
+
+windows = os.name != 'posix'
+if windows:
+    import win32pipe, win32file, pywintypes
+
+if windows:
+    def p_create(name, read):
+        return win32pipe.CreateNamedPipe(
+            f'\\\\.\\pipe\\{name}',
+            win32pipe.PIPE_ACCESS_DUPLEX,
+            win32pipe.PIPE_TYPE_MESSAGE | win32pipe.PIPE_READMODE_MESSAGE | win32pipe.PIPE_WAIT,
+            1, 65536, 65536,
+            0,
+            None)
+
+    def p_open(pipe):
+        for retry in range(4,-1,-1):
+            try:
+                win32pipe.ConnectNamedPipe(pipe, None)
+                return pipe
+            except pywintypes.error as e:
+                print(f"Something went wrong, error {e.args[0]}, {retry} attempts remain")
+                time.sleep(1)
+
+    def p_connect(name, read):
+        while True:
+            try:
+                handle = win32file.CreateFile(
+                    f'\\\\.\\pipe\\{name}',
+                    win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+                    0,
+                    None,
+                    win32file.OPEN_EXISTING,
+                    0,
+                    None)
+            except pywintypes.error as e:
+                if e.args[0] != 2:      # 2: pipe does not exist yet
+                    raise
+                time.sleep(0.01)
+                continue
+            win32pipe.SetNamedPipeHandleState(handle, win32pipe.PIPE_READMODE_MESSAGE, None, None)
+            return handle
+
+    def p_close(pipe):
+        win32file.CloseHandle(pipe)
+
+    def p_write(pipe, message):
+        win32file.WriteFile(pipe, message.encode('utf-8'))
+
+    def p_read(pipe):
+        res, buffer = win32file.ReadFile(pipe, 16384)
+        return buffer.decode()
+
+    def p_write_sample(pipe, value):
+        win32file.WriteFile(pipe, struct.pack("@d", value))
+
+    def p_read_sample(pipe):
+        res, buffer = win32file.ReadFile(pipe, 8)
+        return struct.unpack("@d", buffer)[0]
+else:
+    def p_create(name, read):
+        path = f'/tmp/{name}'
+        if os.path.exists(path):
+            os.remove(path)
+        os.mkfifo(path)
+        if read:
+            return open(path, 'r')
+        else:
+            return open(path, 'w', 1)
+
+    def p_open(pipe):
+        pass
+
+    def p_connect(name, read):
+        path = f'/tmp/{name}'
+        while not os.path.exists(path):
+            time.sleep(0.01)
+        if read:
+            return open(path, 'r')
+        else:
+            return open(path, 'w', 1)
+
+    def p_close(pipe):
+        name = pipe.name
+        pipe.close()
+        if os.path.exists(name):    # the other end may have removed it already
+            os.remove(name)
+
+    def p_write(pipe, message):
+        pipe.write(message + '\n')
+
+    def p_read(pipe):
+        return pipe.readline()[:-1]
+
+    # samples bypass the text layer, don't mix them with p_write/p_read on the same pipe
+    def p_write_sample(pipe, value):
+        os.write(pipe.fileno(), struct.pack("@d", value))
+
+    def p_read_sample(pipe):
+        return struct.unpack("@d", os.read(pipe.fileno(), 8))[0]
@@ -1,7 +1,7 @@
 import time
 import sys
 import win32pipe, win32file, pywintypes
-import struct
+from pipeHelpers import p_write_sample, p_read_sample
 
 
 def pipe_server():
@@ -72,8 +72,7 @@ def pipe_write(server):
         count = -100
         try:
             while True:
-                sample = struct.pack("@d", 0.01 * (count%200) * (1 if count%2 else -1))
-                win32file.WriteFile(handle, sample)
+                p_write_sample(handle, 0.01 * (count%200) * (1 if count%2 else -1))
                 time.sleep(0.01)
                 count += 1
             win32file.CloseHandle(handle)
@@ -92,8 +91,7 @@ def pipe_read(server):
         handle = get_pipe_server(pipename, True) if server else get_pipe_client(pipename, True)
         try:
             while True:
-                res, buffer = win32file.ReadFile(handle, 8)
-                sample = struct.unpack("@d", buffer)[0]
+                sample = p_read_sample(handle)
                 print(sample)
         except pywintypes.error as e:
             print(f"Something went wrong, error {e.args[0]}")